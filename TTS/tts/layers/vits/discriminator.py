@@ -1,28 +1,77 @@
 import torch
 from torch import nn
+from torch.nn import functional as F
 from torch.nn.modules.conv import Conv1d
+from torch.nn.utils.parametrize import is_parametrized, remove_parametrizations
 
 from TTS.vocoder.models.hifigan_discriminator import DiscriminatorP, MultiPeriodDiscriminator
 
 
+def grouped_conv1d_as_bmm(x, weight, bias, groups, stride, padding):
+    """Compute a grouped 1D convolution as `unfold` followed by a single batched matmul.
+
+    Args:
+        x (Tensor): input tensor.
+        weight (Tensor): grouped convolution weight as stored by `Conv1d`.
+        bias (Tensor): convolution bias or `None`.
+        groups (int): number of groups.
+        stride (int): convolution stride.
+        padding (int): zero padding on both sides.
+
+    Shapes:
+        x: [B, G * C_in, T]
+        weight: [G * C_out, C_in, K]
+        bias: [G * C_out]
+        Tensor: [B, G * C_out, T']
+    """
+    b = x.size(0)
+    c_out, c_in, k = weight.shape
+    # [B, G * C_in * K, T'] -> [B, G, C_in * K, T']
+    cols = F.unfold(x.unsqueeze(-1), kernel_size=(k, 1), padding=(padding, 0), stride=(stride, 1))
+    cols = cols.view(b, groups, c_in * k, -1)
+    # [1, G, C_out / G, C_in * K] x [B, G, C_in * K, T'] -> [B, G, C_out / G, T']
+    out = torch.matmul(weight.view(1, groups, c_out // groups, c_in * k), cols)
+    out = out.reshape(b, c_out, -1)
+    if bias is not None:
+        # match the matmul dtype, otherwise an fp32 bias promotes autocast outputs back to fp32
+        out = out + bias.to(out.dtype).view(1, -1, 1)
+    return out
+
+
+class GroupedConv1d(Conv1d):
+    """`Conv1d` that runs grouped convolutions on CUDA through `grouped_conv1d_as_bmm` instead of the per-group
+    cuDNN kernels. Parameters are identical to `Conv1d`, so checkpoints are interchangeable."""
+
+    def _conv_forward(self, input, weight, bias):  # pylint: disable=redefined-builtin
+        if input.is_cuda and self.groups > 1 and self.dilation[0] == 1 and self.padding_mode == "zeros":
+            return grouped_conv1d_as_bmm(input, weight, bias, self.groups, self.stride[0], self.padding[0])
+        return super()._conv_forward(input, weight, bias)
+
+
 class DiscriminatorS(torch.nn.Module):
     """HiFiGAN Scale Discriminator. Channel sizes are different from the original HiFiGAN.
 
     Args:
         use_spectral_norm (bool): if `True` swith to spectral norm instead of weight norm.
+        groups_impl (str): implementation of the grouped convolutions. `native` uses `Conv1d`, `batched_bmm` uses
+            `GroupedConv1d`. Defaults to `native`.
+        bias (bool): if `False` the hidden convolutional layers have no bias. Defaults to True.
     """
 
-    def __init__(self, use_spectral_norm=False):
+    def __init__(self, use_spectral_norm=False, groups_impl="native", bias=True):
         super().__init__()
+        if groups_impl not in ["native", "batched_bmm"]:
+            raise ValueError(f" [!] Unknown `groups_impl`: {groups_impl}")
         norm_f = nn.utils.spectral_norm if use_spectral_norm else nn.utils.parametrizations.weight_norm
+        grouped_conv = GroupedConv1d if groups_impl == "batched_bmm" else Conv1d
         self.convs = nn.ModuleList(
             [
-                norm_f(Conv1d(1, 16, 15, 1, padding=7)),
-                norm_f(Conv1d(16, 64, 41, 4, groups=4, padding=20)),
-                norm_f(Conv1d(64, 256, 41, 4, groups=16, padding=20)),
-                norm_f(Conv1d(256, 1024, 41, 4, groups=64, padding=20)),
-                norm_f(Conv1d(1024, 1024, 41, 4, groups=256, padding=20)),
-                norm_f(Conv1d(1024, 1024, 5, 1, padding=2)),
+                norm_f(Conv1d(1, 16, 15, 1, padding=7, bias=bias)),
+                norm_f(grouped_conv(16, 64, 41, 4, groups=4, padding=20, bias=bias)),
+                norm_f(grouped_conv(64, 256, 41, 4, groups=16, padding=20, bias=bias)),
+                norm_f(grouped_conv(256, 1024, 41, 4, groups=64, padding=20, bias=bias)),
+                norm_f(grouped_conv(1024, 1024, 41, 4, groups=256, padding=20, bias=bias)),
+                norm_f(Conv1d(1024, 1024, 5, 1, padding=2, bias=bias)),
             ]
         )
         self.conv_post = norm_f(Conv1d(1024, 1, 3, 1, padding=1))
@@ -36,16 +85,23 @@ class DiscriminatorS(torch.nn.Module):
             Tensor: discriminator scores.
             List[Tensor]: list of features from the convolutiona layers.
         """
-        feat = []
-        for l in self.convs:
+        feat = [None] * (len(self.convs) + 1)
+        for i, l in enumerate(self.convs):
             x = l(x)
-            x = torch.nn.functional.leaky_relu(x, 0.1)
-            feat.append(x)
+            x = F.leaky_relu_(x, 0.1)
+            feat[i] = x
         x = self.conv_post(x)
-        feat.append(x)
+        feat[-1] = x
         x = torch.flatten(x, 1, -1)
         return x, feat
 
+    def remove_biases(self, eps=1e-3):
+        """Drop the bias of every hidden convolutional layer whose bias values are all below `eps` in magnitude, so
+        the bias add is skipped at inference. Meant for trained models, it slightly changes the outputs."""
+        for l in self.convs:
+            if l.bias is not None and l.bias.abs().max() < eps:
+                l.bias = None
+
 
 class VitsDiscriminator(nn.Module):
     """VITS discriminator wrapping one Scale Discriminator and a stack of Period Discriminator.
@@ -54,15 +110,54 @@ class VitsDiscriminator(nn.Module):
         waveform -> ScaleDiscriminator() -> scores_sd, feats_sd --> append() -> scores, feats
                |--> MultiPeriodDiscriminator() -> scores_mpd, feats_mpd ^
 
+    When `x` and `x_hat` have the same shape they are concatenated and each sub-discriminator runs once on the
+    batch. This is skipped with spectral norm, since its power iteration updates once per call in training and
+    batching would score `x_hat` with a different weight estimate than two separate calls.
+
     Args:
         use_spectral_norm (bool): if `True` swith to spectral norm instead of weight norm.
+        groups_impl (str): implementation of the grouped convolutions in the Scale Discriminator. Defaults to `native`.
+        bias (bool): if `False` the hidden convolutional layers of the Scale Discriminator have no bias. Defaults to
+            True.
+        compile_model (bool): if `True` compile each sub-discriminator with `torch.compile`. Sub-discriminators are
+            compiled in place with `nn.Module.compile` (torch>=2.2) and separately, so parameter names are unchanged
+            and each one specializes on its own input shapes. Inputs should have a fixed length (e.g. VITS training
+            segments) to avoid recompilation. Defaults to False.
+        compile_mode (str): `torch.compile` mode. Defaults to `reduce-overhead`.
+        autocast_dtype (Union[torch.dtype, str]): if set, run the discriminators under `torch.autocast` with this
+            dtype, e.g. `torch.bfloat16` or `"bfloat16"`. Strings must be `float16` or `bfloat16`. Scores and features
+            are returned in that dtype. Defaults to None.
+        use_cuda_streams (bool): if `True` run each sub-discriminator on its own CUDA stream so that their kernels can
+            overlap. Ignored for CPU inputs. Defaults to False.
     """
 
-    def __init__(self, periods=(2, 3, 5, 7, 11), use_spectral_norm=False):
+    def __init__(
+        self,
+        periods=(2, 3, 5, 7, 11),
+        use_spectral_norm=False,
+        groups_impl="native",
+        bias=True,
+        compile_model=False,
+        compile_mode="reduce-overhead",
+        autocast_dtype=None,
+        use_cuda_streams=False,
+    ):
         super().__init__()
+        if isinstance(autocast_dtype, str) and autocast_dtype not in ["float16", "bfloat16"]:
+            raise ValueError(f" [!] Unknown `autocast_dtype`: {autocast_dtype}")
+        self.use_spectral_norm = use_spectral_norm
+        self.autocast_dtype = getattr(torch, autocast_dtype) if isinstance(autocast_dtype, str) else autocast_dtype
+        self.use_cuda_streams = use_cuda_streams
+        # one CUDA stream per sub-discriminator and device, created on first use
+        self._streams = {}
         self.nets = nn.ModuleList()
-        self.nets.append(DiscriminatorS(use_spectral_norm=use_spectral_norm))
+        self.nets.append(DiscriminatorS(use_spectral_norm=use_spectral_norm, groups_impl=groups_impl, bias=bias))
         self.nets.extend([DiscriminatorP(i, use_spectral_norm=use_spectral_norm) for i in periods])
+        if compile_model:
+            if not hasattr(nn.Module, "compile"):
+                raise RuntimeError(" [!] `compile_model` requires torch>=2.2 for `nn.Module.compile`.")
+            for net in self.nets:
+                net.compile(mode=compile_mode)
 
     def forward(self, x, x_hat=None):
         """
@@ -74,16 +169,67 @@ class VitsDiscriminator(nn.Module):
             List[Tensor]: discriminator scores.
             List[List[Tensor]]: list of list of features from each layers of each discriminator.
         """
+        if self.autocast_dtype is None:
+            return self._forward(x, x_hat)
+        with torch.autocast(device_type=x.device.type, dtype=self.autocast_dtype):
+            return self._forward(x, x_hat)
+
+    def remove_weight_norm(self):
+        """Fold weight norm or spectral norm into plain conv weights for inference. Call it before compiling or
+        exporting the model, since both norms otherwise recompute the weights at every forward pass."""
+        for m in self.modules():
+            if is_parametrized(m, "weight"):
+                remove_parametrizations(m, "weight")
+            elif hasattr(m, "weight_orig"):
+                nn.utils.remove_spectral_norm(m)
+
+    def remove_biases(self, eps=1e-3):
+        """Drop the near-zero biases of the Scale Discriminator. See `DiscriminatorS.remove_biases`."""
+        self.nets[0].remove_biases(eps)
+
+    def __getstate__(self):
+        # CUDA streams cannot be copied or pickled, they are recreated on the next forward
+        state = super().__getstate__()
+        state["_streams"] = {}
+        return state
+
+    def _run_nets(self, x):
+        """Run all the sub-discriminators on `x` and return their `(score, feat)` outputs."""
+        if not (self.use_cuda_streams and x.is_cuda):
+            return [net(x) for net in self.nets]
+        current_stream = torch.cuda.current_stream(x.device)
+        if x.device not in self._streams:
+            self._streams[x.device] = [torch.cuda.Stream(device=x.device) for _ in self.nets]
+        streams = self._streams[x.device]
+        outs = []
+        for net, stream in zip(self.nets, streams):
+            stream.wait_stream(current_stream)
+            x.record_stream(stream)
+            with torch.cuda.stream(stream):
+                outs.append(net(x))
+        for stream in streams:
+            current_stream.wait_stream(stream)
+        return outs
+
+    def _forward(self, x, x_hat):
         x_scores = []
         x_hat_scores = [] if x_hat is not None else None
         x_feats = []
         x_hat_feats = [] if x_hat is not None else None
-        for net in self.nets:
-            x_score, x_feat = net(x)
+        if x_hat is not None and x_hat.shape == x.shape and not self.use_spectral_norm:
+            # run both waveforms through each net in a single batched pass
+            batch_size = x.size(0)
+            for score, feat in self._run_nets(torch.cat([x, x_hat], dim=0)):
+                x_scores.append(score[:batch_size])
+                x_hat_scores.append(score[batch_size:])
+                x_feats.append([f[:batch_size] for f in feat])
+                x_hat_feats.append([f[batch_size:] for f in feat])
+            return x_scores, x_feats, x_hat_scores, x_hat_feats
+        for x_score, x_feat in self._run_nets(x):
             x_scores.append(x_score)
             x_feats.append(x_feat)
-            if x_hat is not None:
-                x_hat_score, x_hat_feat = net(x_hat)
+        if x_hat is not None:
+            for x_hat_score, x_hat_feat in self._run_nets(x_hat):
                 x_hat_scores.append(x_hat_score)
                 x_hat_feats.append(x_hat_feat)
         return x_scores, x_feats, x_hat_scores, x_hat_feats
@@ -543,6 +543,12 @@ class VocoderConfig(Coqpit):
     use_spectral_norm_discriminator: bool = False
     upsampling_rates_discriminator: List[int] = field(default_factory=lambda: [4, 4, 4, 4])
     periods_discriminator: List[int] = field(default_factory=lambda: [2, 3, 5, 7, 11])
+    groups_impl_discriminator: str = "native"
+    use_bias_discriminator: bool = True
+    compile_discriminator: bool = False
+    compile_mode_discriminator: str = "reduce-overhead"
+    autocast_dtype_discriminator: str = None
+    use_cuda_streams_discriminator: bool = False
     pretrained_model_path: Optional[str] = None
 
 
@@ -696,6 +702,12 @@ class DelightfulTTS(BaseTTSE2E):
             self.disc = VitsDiscriminator(
                 use_spectral_norm=self.config.vocoder.use_spectral_norm_discriminator,
                 periods=self.config.vocoder.periods_discriminator,
+                groups_impl=self.config.vocoder.groups_impl_discriminator,
+                bias=self.config.vocoder.use_bias_discriminator,
+                compile_model=self.config.vocoder.compile_discriminator,
+                compile_mode=self.config.vocoder.compile_mode_discriminator,
+                autocast_dtype=self.config.vocoder.autocast_dtype_discriminator,
+                use_cuda_streams=self.config.vocoder.use_cuda_streams_discriminator,
             )
 
     @property
@@ -465,6 +465,25 @@ class VitsArgs(Coqpit):
         use_spectral_norm_disriminator (bool):
             Use spectral normalization over weight norm in the discriminator. Defaults to False.
 
+        groups_impl_discriminator (str):
+            Implementation of the grouped convolutions in the discriminator. `native` or `batched_bmm`.
+            Defaults to `native`.
+
+        use_bias_discriminator (bool):
+            Use biases in the hidden convolutional layers of the scale discriminator. Defaults to True.
+
+        compile_discriminator (bool):
+            Compile each sub-discriminator with `torch.compile`. Defaults to False.
+
+        compile_mode_discriminator (str):
+            `torch.compile` mode used for the discriminator. Defaults to `reduce-overhead`.
+
+        autocast_dtype_discriminator (str):
+            If set, run the discriminator under `torch.autocast` with this dtype, e.g. `bfloat16`. Defaults to None.
+
+        use_cuda_streams_discriminator (bool):
+            Run each sub-discriminator on its own CUDA stream. Defaults to False.
+
         use_speaker_embedding (bool):
             Enable/Disable speaker embedding for multi-speaker models. Defaults to False.
 
@@ -573,6 +592,12 @@ class VitsArgs(Coqpit):
     max_inference_len: int = None
     init_discriminator: bool = True
     use_spectral_norm_disriminator: bool = False
+    groups_impl_discriminator: str = "native"
+    use_bias_discriminator: bool = True
+    compile_discriminator: bool = False
+    compile_mode_discriminator: str = "reduce-overhead"
+    autocast_dtype_discriminator: str = None
+    use_cuda_streams_discriminator: bool = False
     use_speaker_embedding: bool = False
     num_speakers: int = 0
     speakers_file: str = None
@@ -721,6 +746,12 @@ class Vits(BaseTTS):
             self.disc = VitsDiscriminator(
                 periods=self.args.periods_multi_period_discriminator,
                 use_spectral_norm=self.args.use_spectral_norm_disriminator,
+                groups_impl=self.args.groups_impl_discriminator,
+                bias=self.args.use_bias_discriminator,
+                compile_model=self.args.compile_discriminator,
+                compile_mode=self.args.compile_mode_discriminator,
+                autocast_dtype=self.args.autocast_dtype_discriminator,
+                use_cuda_streams=self.args.use_cuda_streams_discriminator,
             )
 
     @property
@@ -1,7 +1,29 @@
-import numpy as np
+import math
+from typing import List
+
 import torch
 import torch.nn.functional as F
-from scipy import signal as sig
+from torch import Tensor
+
+
+def kaiser_firwin(numtaps, cutoff, beta):
+    """Lowpass FIR filter designed with the window method and a Kaiser window.
+
+    Equivalent to `scipy.signal.firwin(numtaps, cutoff, window=("kaiser", beta))`.
+
+    Args:
+        numtaps (int): length of the filter.
+        cutoff (float): cutoff frequency relative to the Nyquist frequency.
+        beta (float): shape parameter of the Kaiser window.
+
+    Returns:
+        Tensor: filter coefficients in float64.
+    """
+    m = torch.arange(numtaps, dtype=torch.float64) - 0.5 * (numtaps - 1)
+    h = cutoff * torch.sinc(cutoff * m)
+    h = h * torch.kaiser_window(numtaps, periodic=False, beta=beta, dtype=torch.float64)
+    # scale to unity gain at DC
+    return h / h.sum()
 
 
 # adapted from
@@ -15,39 +37,47 @@ class PQMF(torch.nn.Module):
         self.cutoff = cutoff
         self.beta = beta
 
-        QMF = sig.firwin(taps + 1, cutoff, window=("kaiser", beta))
-        H = np.zeros((N, len(QMF)))
-        G = np.zeros((N, len(QMF)))
-        for k in range(N):
-            constant_factor = (
-                (2 * k + 1) * (np.pi / (2 * N)) * (np.arange(taps + 1) - ((taps - 1) / 2))
-            )  # TODO: (taps - 1) -> taps
-            phase = (-1) ** k * np.pi / 4
-            H[k] = 2 * QMF * np.cos(constant_factor + phase)
+        QMF = kaiser_firwin(taps + 1, cutoff, beta)
+        # [N, 1] band index against [1, taps + 1] filter tap
+        k = torch.arange(N, dtype=torch.float64).unsqueeze(1)
+        n = torch.arange(taps + 1, dtype=torch.float64).unsqueeze(0)
+        constant_factor = (2 * k + 1) * (math.pi / (2 * N)) * (n - ((taps - 1) / 2))  # TODO: (taps - 1) -> taps
+        phase = (1 - 2 * (k % 2)) * math.pi / 4
+        H = 2 * QMF * torch.cos(constant_factor + phase)
+        G = 2 * QMF * torch.cos(constant_factor - phase)
 
-            G[k] = 2 * QMF * np.cos(constant_factor - phase)
-
-        H = torch.from_numpy(H[:, None, :]).float()
-        G = torch.from_numpy(G[None, :, :]).float()
+        H = H[:, None, :].float()
+        G = G[None, :, :].float()
 
         self.register_buffer("H", H)
         self.register_buffer("G", G)
 
-        updown_filter = torch.zeros((N, N, N)).float()
-        for k in range(N):
-            updown_filter[k, k, 0] = 1.0
-        self.register_buffer("updown_filter", updown_filter)
-        self.N = N
-
         self.pad_fn = torch.nn.ConstantPad1d(taps // 2, 0.0)
 
-    def forward(self, x):
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # older checkpoints store the one-hot upsampling filter that `synthesis` no longer uses
+        state_dict.pop(prefix + "updown_filter", None)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
+    def forward(self, x: Tensor) -> Tensor:
         return self.analysis(x)
 
-    def analysis(self, x):
+    def analysis(self, x: Tensor) -> Tensor:
         return F.conv1d(x, self.H, padding=self.taps // 2, stride=self.N)
 
-    def synthesis(self, x):
-        x = F.conv_transpose1d(x, self.updown_filter * self.N, stride=self.N)
-        x = F.conv1d(x, self.G, padding=self.taps // 2)
+    @torch.jit.export
+    def analysis_batched(self, xs: List[Tensor]) -> List[Tensor]:
+        """Apply `analysis` to a list of waveforms with a single convolution call.
+
+        Inputs must match in all but the batch dimension. Outputs are returned in the same order.
+        """
+        x = torch.cat(xs, dim=0)
+        return list(torch.split(self.analysis(x), [x_.size(0) for x_ in xs], dim=0))
+
+    @torch.jit.export
+    def synthesis(self, x: Tensor) -> Tensor:
+        # upsample by zero insertion
+        y = x.new_zeros((x.size(0), x.size(1), x.size(2) * self.N))
+        y[:, :, :: self.N] = x * self.N
+        x = F.conv1d(y, self.G, padding=self.taps // 2)
         return x
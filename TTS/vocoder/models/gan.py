@@ -106,7 +106,9 @@ class GAN(BaseVocoder):
                 self.y_hat_sub = y_hat
                 y_hat = self.model_g.pqmf_synthesis(y_hat)
                 self.y_hat_g = y_hat  # save for generator loss
-                self.y_sub_g = self.model_g.pqmf_analysis(y)
+                # sub-band analysis of the real waveform is computed once per step and only if the loss uses it
+                if self.config.get("use_subband_stft_loss", False):
+                    self.y_sub_g = self.model_g.pqmf_analysis(y)
 
             scores_fake, feats_fake, feats_real = None, None, None
 
@@ -123,14 +125,14 @@ class GAN(BaseVocoder):
                     if y_hat.shape[1] > 1:
                         y_hat = self.model_g.pqmf_synthesis(y_hat)
                 else:
-                    # use the same samples as generator
-                    x_d = x.clone()
-                    y_d = y.clone()
+                    # use the same samples as generator. D does not modify its inputs, so no copies are needed.
+                    x_d = x
+                    y_d = y
                     y_hat = self.y_hat_g
 
                 # run D with or without cond. features
                 if len(signature(self.model_d.forward).parameters) == 2:
-                    D_out_fake = self.model_d(y_hat.detach().clone(), x_d)
+                    D_out_fake = self.model_d(y_hat.detach(), x_d)
                     D_out_real = self.model_d(y_d, x_d)
                 else:
                     D_out_fake = self.model_d(y_hat.detach())
@@ -30,13 +30,14 @@ class DiscriminatorP(torch.nn.Module):
         super().__init__()
         self.period = period
         get_padding = lambda k, d: int((k * d - d) / 2)
+        padding = (get_padding(kernel_size, 1), 0)
         norm_f = nn.utils.spectral_norm if use_spectral_norm else nn.utils.parametrizations.weight_norm
         self.convs = nn.ModuleList(
             [
-                norm_f(nn.Conv2d(1, 32, (kernel_size, 1), (stride, 1), padding=(get_padding(kernel_size, 1), 0))),
-                norm_f(nn.Conv2d(32, 128, (kernel_size, 1), (stride, 1), padding=(get_padding(kernel_size, 1), 0))),
-                norm_f(nn.Conv2d(128, 512, (kernel_size, 1), (stride, 1), padding=(get_padding(kernel_size, 1), 0))),
-                norm_f(nn.Conv2d(512, 1024, (kernel_size, 1), (stride, 1), padding=(get_padding(kernel_size, 1), 0))),
+                norm_f(nn.Conv2d(1, 32, (kernel_size, 1), (stride, 1), padding=padding)),
+                norm_f(nn.Conv2d(32, 128, (kernel_size, 1), (stride, 1), padding=padding)),
+                norm_f(nn.Conv2d(128, 512, (kernel_size, 1), (stride, 1), padding=padding)),
+                norm_f(nn.Conv2d(512, 1024, (kernel_size, 1), (stride, 1), padding=padding)),
                 norm_f(nn.Conv2d(1024, 1024, (kernel_size, 1), 1, padding=(2, 0))),
             ]
         )
@@ -66,7 +67,7 @@ class DiscriminatorP(torch.nn.Module):
 
         for l in self.convs:
             x = l(x)
-            x = F.leaky_relu(x, LRELU_SLOPE)
+            x = F.leaky_relu_(x, LRELU_SLOPE)
             feat.append(x)
         x = self.conv_post(x)
         feat.append(x)
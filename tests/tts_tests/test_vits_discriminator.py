@@ -0,0 +1,132 @@
+import copy
+import unittest
+
+import torch
+
+from TTS.tts.layers.vits.discriminator import DiscriminatorS, VitsDiscriminator, grouped_conv1d_as_bmm
+
+
+def test_vits_discriminator():
+    model = VitsDiscriminator(periods=(2, 3))
+    x = torch.rand(2, 1, 4096)
+    x_hat = torch.rand(2, 1, 4096)
+    x_scores, x_feats, x_hat_scores, x_hat_feats = model(x, x_hat)
+    assert len(x_scores) == len(x_hat_scores) == 3
+    assert len(x_feats) == len(x_hat_feats) == 3
+    # batched pass matches separate passes
+    ref_scores, ref_feats, _, _ = model(x)
+    ref_hat_scores, ref_hat_feats, _, _ = model(x_hat)
+    for s, s_ref, s_hat, s_hat_ref in zip(x_scores, ref_scores, x_hat_scores, ref_hat_scores):
+        assert torch.allclose(s, s_ref, atol=1e-5)
+        assert torch.allclose(s_hat, s_hat_ref, atol=1e-5)
+    for f, f_ref, f_hat, f_hat_ref in zip(x_feats[0], ref_feats[0], x_hat_feats[0], ref_hat_feats[0]):
+        assert f.shape == f_ref.shape
+        assert torch.allclose(f, f_ref, atol=1e-5)
+        assert torch.allclose(f_hat, f_hat_ref, atol=1e-5)
+
+
+def test_grouped_conv1d_as_bmm():
+    x = torch.rand(2, 64, 256)
+    conv = torch.nn.Conv1d(64, 256, 41, 4, groups=16, padding=20)
+    out = grouped_conv1d_as_bmm(x, conv.weight, conv.bias, 16, 4, 20)
+    assert torch.allclose(out, conv(x), atol=1e-5)
+    with torch.autocast(device_type="cpu", dtype=torch.bfloat16):
+        out = grouped_conv1d_as_bmm(x, conv.weight, conv.bias, 16, 4, 20)
+        assert out.dtype == conv(x).dtype == torch.bfloat16
+
+
+def test_vits_discriminator_autocast():
+    model = VitsDiscriminator(periods=(2, 3), autocast_dtype=torch.bfloat16)
+    x = torch.rand(2, 1, 4096)
+    x_scores, x_feats, x_hat_scores, _ = model(x, x)
+    assert x_scores[0].dtype == torch.bfloat16
+    assert x_feats[0][0].dtype == torch.bfloat16
+    assert len(x_hat_scores) == 3
+    assert VitsDiscriminator(periods=(2,), autocast_dtype="bfloat16").autocast_dtype == torch.bfloat16
+    with unittest.TestCase().assertRaises(ValueError):
+        VitsDiscriminator(periods=(2,), autocast_dtype="float32")
+
+
+def test_vits_discriminator_remove_weight_norm():
+    for use_spectral_norm in [False, True]:
+        model = VitsDiscriminator(periods=(2, 3), use_spectral_norm=use_spectral_norm).eval()
+        x = torch.rand(2, 1, 4096)
+        scores, _, _, _ = model(x)
+        model.remove_weight_norm()
+        for m in model.modules():
+            assert not hasattr(m, "parametrizations")
+            assert not hasattr(m, "weight_orig")
+        scores_fused, _, _, _ = model(x)
+        for s, s_fused in zip(scores, scores_fused):
+            assert torch.allclose(s, s_fused, atol=1e-5)
+
+
+def test_discriminator_s_remove_biases():
+    model = DiscriminatorS()
+    with torch.no_grad():
+        model.convs[1].bias.zero_()
+    x = torch.rand(2, 1, 4096)
+    score, _ = model(x)
+    model.remove_biases()
+    assert model.convs[1].bias is None
+    assert model.convs[0].bias is not None
+    score_fused, _ = model(x)
+    assert torch.allclose(score, score_fused, atol=1e-6)
+    assert all(l.bias is None for l in DiscriminatorS(bias=False).convs)
+
+
+def test_vits_discriminator_remove_biases():
+    model = VitsDiscriminator(periods=(2,))
+    with torch.no_grad():
+        model.nets[0].convs[2].bias.uniform_(-1e-4, 1e-4)
+    model.remove_biases()
+    assert model.nets[0].convs[2].bias is None
+    assert model.nets[0].convs[1].bias is not None
+    model = VitsDiscriminator(periods=(2,), bias=False)
+    assert all(l.bias is None for l in model.nets[0].convs)
+
+
+def test_vits_discriminator_spectral_norm():
+    model = VitsDiscriminator(periods=(2, 3), use_spectral_norm=True).train()
+    model_ref = copy.deepcopy(model)
+    x = torch.rand(2, 1, 4096)
+    x_hat = torch.rand(2, 1, 4096)
+    x_scores, _, x_hat_scores, _ = model(x, x_hat)
+    # power iteration runs once per call, as with separate calls for x and x_hat
+    for i, net_ref in enumerate(model_ref.nets):
+        x_score, _ = net_ref(x)
+        x_hat_score, _ = net_ref(x_hat)
+        assert torch.allclose(x_scores[i], x_score, atol=1e-5)
+        assert torch.allclose(x_hat_scores[i], x_hat_score, atol=1e-5)
+
+
+@unittest.skipIf(not torch.cuda.is_available(), "CUDA is not available")
+def test_vits_discriminator_cuda_streams():
+    model = VitsDiscriminator(periods=(2, 3)).cuda()
+    model_streams = copy.deepcopy(model)
+    model_streams.use_cuda_streams = True
+    x = torch.rand(2, 1, 4096, device="cuda")
+    x_hat = torch.rand(2, 1, 4096, device="cuda")
+    for _ in range(2):  # second call reuses the cached streams
+        outs = model(x, x_hat)
+        outs_streams = model_streams(x, x_hat)
+        torch.cuda.synchronize()
+        for scores, scores_streams in [(outs[0], outs_streams[0]), (outs[2], outs_streams[2])]:
+            for s, s_streams in zip(scores, scores_streams):
+                assert torch.allclose(s, s_streams, atol=1e-5)
+    assert len(model_streams._streams) == 1  # pylint: disable=protected-access
+    copy.deepcopy(model_streams)
+
+
+def test_vits_discriminator_compile():
+    model = VitsDiscriminator(periods=(2,))
+    model_compiled = VitsDiscriminator(periods=(2,), compile_model=True, compile_mode="default")
+    assert list(model_compiled.state_dict()) == list(model.state_dict())
+    model_compiled.load_state_dict(model.state_dict())
+    x = torch.rand(2, 1, 4096)
+    x_hat = torch.rand(2, 1, 4096)
+    outs = model(x, x_hat)
+    outs_compiled = model_compiled(x, x_hat)
+    for scores, scores_compiled in [(outs[0], outs_compiled[0]), (outs[2], outs_compiled[2])]:
+        for s, s_compiled in zip(scores, scores_compiled):
+            assert torch.allclose(s, s_compiled, atol=1e-4)
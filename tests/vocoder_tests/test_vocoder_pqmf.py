@@ -1,11 +1,13 @@
 import os
 
+import numpy as np
 import soundfile as sf
 import torch
 from librosa.core import load
+from scipy import signal as sig
 
 from tests import get_tests_input_path, get_tests_output_path, get_tests_path
-from TTS.vocoder.layers.pqmf import PQMF
+from TTS.vocoder.layers.pqmf import PQMF, kaiser_firwin
 
 TESTS_PATH = get_tests_path()
 WAV_FILE = os.path.join(get_tests_input_path(), "example_1.wav")
@@ -24,3 +26,37 @@ def test_pqmf():
     print(w2_.min())
     print(w2_.mean())
     sf.write(os.path.join(get_tests_output_path(), "pqmf_output.wav"), w2_.flatten().detach(), sr)
+
+
+def test_pqmf_analysis_batched():
+    layer = PQMF(N=4, taps=62, cutoff=0.15, beta=9.0)
+    x = torch.rand(2, 1, 1024)
+    x_hat = torch.rand(3, 1, 1024)
+    b, b_hat = layer.analysis_batched([x, x_hat])
+    assert torch.allclose(b, layer.analysis(x), atol=1e-6)
+    assert torch.allclose(b_hat, layer.analysis(x_hat), atol=1e-6)
+
+
+def test_pqmf_script():
+    layer = PQMF(N=4, taps=62, cutoff=0.15, beta=9.0)
+    scripted = torch.jit.script(layer)
+    x = torch.rand(2, 1, 1024)
+    assert torch.allclose(scripted.analysis(x), layer.analysis(x), atol=1e-6)
+    assert torch.allclose(scripted.synthesis(layer.analysis(x)), layer.synthesis(layer.analysis(x)), atol=1e-6)
+    for b, b_ref in zip(scripted.analysis_batched([x, x]), layer.analysis_batched([x, x])):
+        assert torch.allclose(b, b_ref, atol=1e-6)
+
+
+def test_kaiser_firwin():
+    for taps, cutoff, beta in [(62, 0.15, 9.0), (256, 0.03, 10.0)]:
+        h = kaiser_firwin(taps + 1, cutoff, beta)
+        h_ref = sig.firwin(taps + 1, cutoff, window=("kaiser", beta))
+        assert np.allclose(h.numpy(), h_ref)
+
+
+def test_pqmf_load_legacy_state_dict():
+    layer = PQMF(N=4, taps=62, cutoff=0.15, beta=9.0)
+    state_dict = layer.state_dict()
+    state_dict["updown_filter"] = torch.zeros(4, 4, 4)
+    layer.load_state_dict(state_dict)
+